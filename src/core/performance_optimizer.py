@@ -9,6 +9,7 @@ from pathlib import Path
 import json
 import psutil
 from dataclasses import dataclass
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 @dataclass
@@ -21,7 +22,7 @@ class TaskMetrics:
 class PerformanceOptimizer:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.performance_history = []
+        self.performance_history = deque(maxlen=1000)
         self.optimization_threshold = 0.8
         self.ai_brain = AIBrain()
         self.optimization_cache = {}
@@ -243,11 +244,7 @@ class PerformanceOptimizer:
             'avg_task_time': execution_time / task_count if task_count > 0 else 0,
             'resource_usage': self._get_resource_usage()
         }
-        self.performance_history.append(metrics)
-        
-        # Trim history if too long
-        if len(self.performance_history) > 1000:
-            self.performance_history = self.performance_history[-1000:]
+        self.performance_history.append(metrics)  # deque drops the oldest past 1000
             
     def _get_resource_usage(self) -> Dict[str, float]:
         """Get current resource usage"""
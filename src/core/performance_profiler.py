@@ -1,55 +1,83 @@
 # src/core/performance_profiler.py
+import copy
+import itertools
 import logging
+import os
 import time
 from functools import wraps
 from typing import Dict, List, Callable, Any, Optional
-from collections import defaultdict
 import json
 from pathlib import Path
 import numpy as np
 from datetime import datetime
 import sqlite3
 import weakref
-import gc
+from collections import deque
+
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    _json_loads = orjson.loads
+except ImportError:  # Fall back to the stdlib encoder
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+_INSERT_METRIC_SQL = '''INSERT INTO execution_metrics
+                        (function_name, execution_time, timestamp, context, success, error)
+                        VALUES (?, ?, ?, ?, ?, ?)'''
+
+def _close_db(conn: sqlite3.Connection, pending: deque):
+    """Flush queued metric rows and close the profiling database"""
+    try:
+        if pending:
+            conn.executemany(_INSERT_METRIC_SQL, list(pending))
+            pending.clear()
+            conn.commit()
+    except sqlite3.Error as e:
+        logging.getLogger(__name__).error(f"Final metric flush failed: {str(e)}")
+    finally:
+        conn.close()
 
 class PerformanceProfiler:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self._metrics = defaultdict(list)  # Use weak references for metrics
+        self._metrics = {}  # func_name -> preallocated float32 ring buffer
+        self._metric_counts = {}  # func_name -> total samples written
+        self._buffer_size = 1024
         self._execution_history = []
         self.profile_db = self._initialize_profile_db()
         self.learning_threshold = 100
         self.pattern_cache = {}
         self._load_config()
-        self._cleanup_interval = 1000  # Cleanup after 1000 records
-        self._last_cleanup = time.time()
+        self._write_version = 0  # Bumped on every metric/pattern write
+        self._report_cache = None  # (write_version, report)
+        self._trend_cache = {}  # func_name -> (sample_count, trend)
+        self._last_maintenance = time.time()
+        self._pending = deque()  # Metric rows awaiting a batched insert
+        self._finalizer = weakref.finalize(self, _close_db, self.profile_db, self._pending)
         
-    def __del__(self):
-        """Cleanup resources on deletion"""
-        try:
-            if hasattr(self, 'profile_db'):
-                self.profile_db.close()
-        except Exception as e:
-            self.logger.error(f"Cleanup failed: {str(e)}")
+    def close(self):
+        """Flush pending metrics and close the database"""
+        self._finalizer()
             
     @property
     def metrics(self):
-        """Safe access to metrics with memory management"""
-        self._cleanup_old_metrics()
-        return self._metrics
+        """Ordered metric samples per function (oldest first)"""
+        return {func_name: self._get_samples(func_name) for func_name in self._metrics}
         
-    def _cleanup_old_metrics(self):
-        """Clean up old metrics to manage memory"""
-        try:
-            current_time = time.time()
-            if current_time - self._last_cleanup > 3600:  # Cleanup every hour
-                for func_name in list(self._metrics.keys()):
-                    if len(self._metrics[func_name]) > self._cleanup_interval:
-                        self._metrics[func_name] = self._metrics[func_name][-self._cleanup_interval:]
-                gc.collect()  # Force garbage collection
-                self._last_cleanup = current_time
-        except Exception as e:
-            self.logger.error(f"Metrics cleanup failed: {str(e)}")
+    def _get_samples(self, func_name: str) -> np.ndarray:
+        """Unroll a function's ring buffer into chronological order"""
+        buf = self._metrics.get(func_name)
+        if buf is None:
+            return np.empty(0, dtype=np.float32)
+        count = self._metric_counts[func_name]
+        if count < self._buffer_size:
+            return buf[:count]
+        head = count % self._buffer_size
+        return np.concatenate((buf[head:], buf[:head]))
         
     def _initialize_profile_db(self) -> sqlite3.Connection:
         """Initialize SQLite database for profiling data"""
@@ -58,15 +86,29 @@ class PerformanceProfiler:
         conn = sqlite3.connect(str(db_path))
         c = conn.cursor()
         
+        # Only takes effect on a fresh database; lets maintenance reclaim pages
+        c.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        
         c.execute('''CREATE TABLE IF NOT EXISTS execution_metrics
                     (id INTEGER PRIMARY KEY, function_name TEXT,
                      execution_time REAL, timestamp TEXT,
-                     context TEXT)''')
+                     context TEXT, success INTEGER, error TEXT)''')
+                     
+        # Older databases were created without the outcome columns
+        columns = {row[1] for row in c.execute('PRAGMA table_info(execution_metrics)')}
+        for column, column_type in (('success', 'INTEGER'), ('error', 'TEXT')):
+            if column not in columns:
+                c.execute(f'ALTER TABLE execution_metrics ADD COLUMN {column} {column_type}')
                      
         c.execute('''CREATE TABLE IF NOT EXISTS performance_patterns
                     (id INTEGER PRIMARY KEY, pattern_type TEXT,
                      pattern_data TEXT, confidence REAL)''')
                      
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_em_func_ts
+                    ON execution_metrics(function_name, timestamp)''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_pp_type
+                    ON performance_patterns(pattern_type)''')
+                     
         conn.commit()
         return conn
         
@@ -90,7 +132,10 @@ class PerformanceProfiler:
             'history_limit': 1000,
             'pattern_confidence_threshold': 0.8,
             'learning_batch_size': 50,
-            'metrics_aggregation_interval': 300  # 5 minutes
+            'metrics_aggregation_interval': 300,  # 5 minutes
+            'maintenance_interval': 86400,  # Daily
+            'max_metric_rows': 1000000,
+            'flush_batch_size': 100
         }
         
     def measure_execution_time(self, func: Callable) -> Callable:
@@ -137,26 +182,64 @@ class PerformanceProfiler:
                                context: Dict, success: bool, error: str = None):
         """Record execution metric with error handling"""
         try:
-            self._metrics[func_name].append(execution_time)
+            buf = self._metrics.get(func_name)
+            if buf is None:
+                buf = self._metrics[func_name] = np.empty(self._buffer_size, dtype=np.float32)
+                self._metric_counts[func_name] = 0
+            count = self._metric_counts[func_name]
+            buf[count % self._buffer_size] = execution_time
+            self._metric_counts[func_name] = count + 1
+            self._write_version += 1
+            
+            # Queue for database storage with error information
+            self._pending.append((func_name, execution_time,
+                                  context['timestamp'],
+                                  _json_dumps(context),
+                                  int(success),
+                                  error))
+                                  
+            if len(self._pending) >= self.config.get('flush_batch_size', 100):
+                self._flush_pending()
+                self._maybe_maintain_db()
             
-            # Store in database with error information
+        except Exception as e:
+            self.logger.error(f"Metric recording failed: {str(e)}")
+            
+    def _flush_pending(self):
+        """Stream queued metric rows into the database in one transaction"""
+        if not self._pending:
+            return
+        pending = self._pending
+        count = len(pending)
+        try:
             c = self.profile_db.cursor()
-            c.execute('''INSERT INTO execution_metrics
-                        (function_name, execution_time, timestamp, context, success, error)
-                        VALUES (?, ?, ?, ?, ?, ?)''',
-                        (func_name, execution_time,
-                         context['timestamp'],
-                         json.dumps(context),
-                         int(success),
-                         error))
-                         
+            c.execute('BEGIN IMMEDIATE')
+            c.executemany(_INSERT_METRIC_SQL, itertools.islice(pending, count))
             self.profile_db.commit()
-            
+            # Drop rows only once committed; a failed batch is retried on the next flush
+            for _ in range(count):
+                pending.popleft()
         except sqlite3.Error as e:
             self.logger.error(f"Database error: {str(e)}")
             self._handle_db_error()
-        except Exception as e:
-            self.logger.error(f"Metric recording failed: {str(e)}")
+            
+    def _maybe_maintain_db(self):
+        """Cap table size and refresh planner statistics once per interval"""
+        current_time = time.time()
+        if current_time - self._last_maintenance < self.config.get('maintenance_interval', 86400):
+            return
+        self._last_maintenance = current_time
+        
+        try:
+            c = self.profile_db.cursor()
+            c.execute('''DELETE FROM execution_metrics
+                        WHERE id < (SELECT max(id) - ? FROM execution_metrics)''',
+                        (self.config.get('max_metric_rows', 1000000),))
+            self.profile_db.commit()
+            c.execute('PRAGMA incremental_vacuum')
+            c.execute('PRAGMA optimize')
+        except sqlite3.Error as e:
+            self.logger.error(f"Database maintenance failed: {str(e)}")
             
     def _handle_db_error(self):
         """Handle database errors"""
@@ -170,7 +253,7 @@ class PerformanceProfiler:
     def _analyze_performance_patterns(self, func_name: str):
         """Analyze performance patterns for learning"""
         try:
-            metrics_data = np.array(self.metrics[func_name])
+            metrics_data = self._get_samples(func_name)
             
             patterns = {
                 'trend': self._calculate_trend(metrics_data),
@@ -200,6 +283,14 @@ class PerformanceProfiler:
         except:
             return {'slope': 0, 'direction': 'stable', 'confidence': 0}
             
+    def _calculate_trend_confidence(self, data: np.ndarray, coefficients: np.ndarray) -> float:
+        """Goodness of the linear trend fit (R squared)"""
+        fitted = np.polyval(coefficients, np.arange(len(data)))
+        total = float(np.sum((data - np.mean(data)) ** 2))
+        if total == 0:
+            return 0.0
+        return max(0.0, 1.0 - float(np.sum((data - fitted) ** 2)) / total)
+            
     def _calculate_variability(self, data: np.ndarray) -> Dict:
         """Calculate performance variability"""
         try:
@@ -234,19 +325,49 @@ class PerformanceProfiler:
                     (pattern_type, pattern_data, confidence)
                     VALUES (?, ?, ?)''',
                     (pattern_type,
-                     json.dumps(pattern_data),
+                     _json_dumps(pattern_data),
                      pattern_data.get('confidence', 0)))
         self.profile_db.commit()
+        self._write_version += 1
         
     def get_performance_report(self) -> Dict[str, Any]:
-        """Generate comprehensive performance report"""
+        """Generate comprehensive performance report (cached until next write)"""
+        cached = self._report_cache
+        if cached is not None and cached[0] == self._write_version:
+            return copy.deepcopy(cached[1])  # Callers may mutate their copy
+            
+        version = self._write_version
         report = {
             'metrics': self.get_metrics(),
             'patterns': self._get_performance_patterns(),
             'anomalies': self._get_anomaly_summary(),
             'recommendations': self._generate_recommendations()
         }
-        return report
+        self._report_cache = (version, report)
+        return copy.deepcopy(report)
+        
+    def get_metrics(self) -> Dict[str, Dict]:
+        """Summary statistics per profiled function"""
+        summary = {}
+        for func_name in self._metrics:
+            samples = self._get_samples(func_name)
+            summary[func_name] = {
+                'count': self._metric_counts[func_name],
+                'mean': float(np.mean(samples)),
+                'median': float(np.median(samples)),
+                'p95': float(np.percentile(samples, 95)),
+                'max': float(np.max(samples))
+            }
+        return summary
+        
+    def _get_anomaly_summary(self) -> Dict[str, Dict]:
+        """Anomalies per function, for functions that have any"""
+        summary = {}
+        for func_name in self._metrics:
+            anomalies = self._detect_anomalies(self._get_samples(func_name))
+            if anomalies['count']:
+                summary[func_name] = anomalies
+        return summary
         
     def _get_performance_patterns(self) -> Dict:
         """Get analyzed performance patterns"""
@@ -256,17 +377,16 @@ class PerformanceProfiler:
             pattern_type, pattern_data = row
             if pattern_type not in patterns:
                 patterns[pattern_type] = []
-            patterns[pattern_type].append(json.loads(pattern_data))
+            patterns[pattern_type].append(_json_loads(pattern_data))
         return patterns
         
     def _generate_recommendations(self) -> List[Dict]:
         """Generate performance improvement recommendations"""
         recommendations = []
-        patterns = self._get_performance_patterns()
         
-        for func_name, metrics in self.metrics.items():
-            if len(metrics) >= self.learning_threshold:
-                trend = self._calculate_trend(np.array(metrics))
+        for func_name, count in self._metric_counts.items():
+            if min(count, self._buffer_size) >= self.learning_threshold:
+                trend = self._get_cached_trend(func_name)
                 if trend['direction'] == 'degrading':
                     recommendations.append({
                         'function': func_name,
@@ -276,10 +396,20 @@ class PerformanceProfiler:
                     
         return recommendations
         
+    def _get_cached_trend(self, func_name: str) -> Dict:
+        """Get trend for a function, recomputed only when new samples arrive"""
+        count = self._metric_counts[func_name]
+        cached = self._trend_cache.get(func_name)
+        if cached is not None and cached[0] == count:
+            return cached[1]
+        trend = self._calculate_trend(self._get_samples(func_name))
+        self._trend_cache[func_name] = (count, trend)
+        return trend
+        
     def _get_system_load(self) -> float:
         """Get current system load"""
         try:
-            return [x / 100 for x in time.getloadavg()][0]
+            return os.getloadavg()[0] * 0.01
         except:
             return 0.0
             
@@ -1,10 +1,14 @@
 # src/core/resource_manager.py
 import logging
 import psutil
-from queue import Queue, PriorityQueue
+import functools
+import heapq
+import itertools
 from typing import Dict, Any, List, Tuple, Optional
 from threading import Lock
 import threading
+import weakref
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 
 class ResourceError(Exception):
@@ -14,15 +18,44 @@ import time
 import json
 from pathlib import Path
 import numpy as np
-from .ai_brain import AIBrain
+
+@functools.lru_cache(maxsize=None)
+def _gpu_available() -> bool:
+    """Probe TensorFlow for GPUs once per process"""
+    try:
+        import tensorflow as tf
+        return len(tf.config.list_physical_devices('GPU')) > 0
+    except:
+        return False
+
+def _monitor_loop(manager_ref: weakref.ref, stop_event: threading.Event, interval: float):
+    """Monitor thread body; holds only a weak reference so the manager can be collected"""
+    while not stop_event.is_set():
+        manager = manager_ref()
+        if manager is None:
+            return
+        manager._monitor_resources()
+        del manager  # Don't keep the manager alive while waiting
+        stop_event.wait(interval)
+
+def _stop_monitor_thread(stop_event: threading.Event, thread: threading.Thread):
+    """Signal the monitor thread to exit and wait briefly for it"""
+    stop_event.set()
+    # The last reference may be dropped on the monitor thread itself
+    if thread is not threading.current_thread():
+        thread.join(timeout=1)
 
 class ResourceManager:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.task_queue = PriorityQueue()
         self.resource_lock = Lock()
-        self.ai_brain = AIBrain()
-        self.resource_history = []
+        self._task_heap = []  # (priority, seq, task) entries guarded by resource_lock
+        self._task_seq = itertools.count()  # Tie-breaker so tasks are never compared
+        self._not_empty = threading.Condition(self.resource_lock)
+        self._ai_brain = None  # Built on first use; importing AIBrain pulls in TensorFlow
+        self._pynvml = None
+        self._nvml_handles = self._init_nvml()
+        self.resource_history = deque(maxlen=1000)
         self.resource_limits = self._load_resource_limits()
         self.monitoring_interval = 5  # seconds
         self.last_optimization = time.time()
@@ -36,16 +69,43 @@ class ResourceManager:
             'cpu_critical': 90,
             'memory_critical': 95
         }
+        self._latest_metrics = {}  # Snapshot published by the monitor thread
+        self._stop_event = threading.Event()
         self._start_resource_monitoring()
+        self._finalizer = weakref.finalize(
+            self, _stop_monitor_thread, self._stop_event, self.monitoring_thread
+        )
+        
+    @property
+    def ai_brain(self):
+        """Lazily construct the AI brain"""
+        if self._ai_brain is None:
+            from .ai_brain import AIBrain
+            self._ai_brain = AIBrain()
+        return self._ai_brain
         
-    def __del__(self):
-        self.stop_monitoring()
+    def _init_nvml(self) -> List:
+        """Initialise NVML once and cache device handles"""
+        try:
+            import pynvml
+            pynvml.nvmlInit()
+            self._pynvml = pynvml
+            return [
+                pynvml.nvmlDeviceGetHandleByIndex(i)
+                for i in range(pynvml.nvmlDeviceGetCount())
+            ]
+        except ImportError:
+            return []  # GPU monitoring not available
+        except Exception as e:
+            self.logger.error(f"NVML initialisation failed: {str(e)}")
+            return []
         
     def _start_resource_monitoring(self):
         """Start background resource monitoring"""
         self.is_monitoring = True
         self.monitoring_thread = threading.Thread(
-            target=self._monitor_resources,
+            target=_monitor_loop,
+            args=(weakref.ref(self), self._stop_event, self.monitoring_interval),
             daemon=True
         )
         self.monitoring_thread.start()
@@ -53,18 +113,18 @@ class ResourceManager:
     def stop_monitoring(self):
         """Stop resource monitoring"""
         self.is_monitoring = False
+        self._stop_event.set()
         if self.monitoring_thread:
             self.monitoring_thread.join(timeout=1)
             
     def _monitor_resources(self):
-        """Background resource monitoring"""
-        while self.is_monitoring:
-            try:
-                metrics = self._get_system_metrics()
-                self._check_resource_thresholds(metrics)
-                time.sleep(self.monitoring_interval)
-            except Exception as e:
-                self.logger.error(f"Resource monitoring error: {str(e)}")
+        """Run one background monitoring pass"""
+        try:
+            metrics = self._get_system_metrics()
+            self._latest_metrics = metrics  # Reference swap is atomic
+            self._check_resource_thresholds(metrics)
+        except Exception as e:
+            self.logger.error(f"Resource monitoring error: {str(e)}")
                 
     def _check_resource_thresholds(self, metrics: Dict[str, float]):
         """Check if resources exceed critical thresholds"""
@@ -98,12 +158,9 @@ class ResourceManager:
     def _cancel_low_priority_tasks(self):
         """Cancel low priority tasks under pressure"""
         try:
-            temp_queue = PriorityQueue()
-            while not self.task_queue.empty():
-                priority, task = self.task_queue.get()
-                if priority > 30:  # Keep only high priority tasks
-                    temp_queue.put((priority, task))
-            self.task_queue = temp_queue
+            # Caller holds resource_lock
+            self._task_heap = [entry for entry in self._task_heap if entry[0] > 30]  # Keep only high priority tasks
+            heapq.heapify(self._task_heap)
         except Exception as e:
             self.logger.error(f"Task cancellation failed: {str(e)}")
         
@@ -139,7 +196,7 @@ class ResourceManager:
                     raise ResourceError("Failed to get system metrics")
                     
                 # Check resource availability
-                if not self._check_resource_availability():
+                if not self._check_resource_availability(system_metrics):
                     raise ResourceError("Insufficient resources available")
                     
                 allocation = self._optimize_resource_allocation(
@@ -201,11 +258,7 @@ class ResourceManager:
             
     def _check_gpu_availability(self) -> bool:
         """Check for GPU availability"""
-        try:
-            import tensorflow as tf
-            return len(tf.config.list_physical_devices('GPU')) > 0
-        except:
-            return False
+        return _gpu_available()
             
     def get_resource_report(self) -> Dict:
         """Generate resource usage report"""
@@ -216,24 +269,22 @@ class ResourceManager:
                 'memory': psutil.virtual_memory().percent
             },
             'optimal_browser_count': self.get_optimal_browser_count(),
-            'resource_history': self.resource_history[-10:]  # Last 10 records
+            'resource_history': self._recent_history(10)  # Last 10 records
         }
 
     def reduce_active_browsers(self, reduction_percent: int):
         """Reduce active browser count by percentage"""
         try:
             with self.resource_lock:
-                current_tasks = list(self.task_queue.queue)
+                current_tasks = self._task_heap
                 reduction_count = int(len(current_tasks) * (reduction_percent / 100))
                 
                 # Keep high priority tasks
                 current_tasks.sort(key=lambda x: x[0], reverse=True)
-                self.task_queue = PriorityQueue()
                 
                 # Re-add tasks after reduction
-                for i, task in enumerate(current_tasks):
-                    if i >= reduction_count:
-                        self.task_queue.put(task)
+                self._task_heap = current_tasks[reduction_count:]
+                heapq.heapify(self._task_heap)
                         
                 self.logger.info(f"Reduced active browsers by {reduction_percent}%")
         except Exception as e:
@@ -276,7 +327,7 @@ class ResourceManager:
             optimization_data = {
                 'metrics': metrics,
                 'task_count': task_count,
-                'history': self.resource_history[-50:] if self.resource_history else []
+                'history': self._recent_history(50)
             }
             
             ai_recommendations = self.ai_brain.analyze_resource_patterns(optimization_data)
@@ -303,10 +354,12 @@ class ResourceManager:
     def queue_task(self, task: Dict) -> bool:
         """Queue task with priority and resource checks"""
         try:
-            if self.task_queue.qsize() < self.resource_limits['max_tasks']:
+            if len(self._task_heap) < self.resource_limits['max_tasks']:
                 if self._check_resource_availability():
                     priority = self._calculate_task_priority(task)
-                    self.task_queue.put((priority, task))
+                    with self._not_empty:
+                        heapq.heappush(self._task_heap, (priority, next(self._task_seq), task))
+                        self._not_empty.notify()
                     
                     # Store task metrics for learning
                     self._record_task_metrics(task, priority)
@@ -338,24 +391,23 @@ class ResourceManager:
             'task_type': task.get('type', 'unknown'),
             'priority': priority,
             'timestamp': time.time(),
-            'resource_state': self._get_system_metrics()
+            'resource_state': self._get_latest_metrics()
         }
-        self.resource_history.append(metrics)
+        self.resource_history.append(metrics)  # deque drops the oldest past 1000
         
-        # Trim history if too long
-        if len(self.resource_history) > 1000:
-            self.resource_history = self.resource_history[-1000:]
+    def _recent_history(self, count: int) -> List[Dict]:
+        """Get the newest history records, oldest first"""
+        return list(itertools.islice(reversed(self.resource_history), count))[::-1]
             
     def _get_gpu_metrics(self) -> Dict[str, float]:
         """Get GPU metrics if available"""
+        if not self._nvml_handles:
+            return {}
         try:
-            import pynvml
-            pynvml.nvmlInit()
+            pynvml = self._pynvml
             metrics = {}
             
-            device_count = pynvml.nvmlDeviceGetCount()
-            for i in range(device_count):
-                handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+            for i, handle in enumerate(self._nvml_handles):
                 info = pynvml.nvmlDeviceGetMemoryInfo(handle)
                 util = pynvml.nvmlDeviceGetUtilizationRates(handle)
                 
@@ -363,8 +415,6 @@ class ResourceManager:
                 metrics[f'gpu_{i}_utilization'] = util.gpu
                 
             return metrics
-        except ImportError:
-            return {}  # GPU monitoring not available
         except Exception as e:
             self.logger.error(f"GPU metrics collection failed: {str(e)}")
             return {}
@@ -378,10 +428,19 @@ class ResourceManager:
             'priority_level': 'medium'
         }
             
-    def _check_resource_availability(self) -> bool:
+    def _get_latest_metrics(self) -> Dict[str, float]:
+        """Get the monitor's latest snapshot, sampling once if none exists yet"""
+        metrics = self._latest_metrics
+        if not metrics:
+            metrics = self._get_system_metrics()
+            self._latest_metrics = metrics
+        return metrics
+        
+    def _check_resource_availability(self, metrics: Optional[Dict[str, float]] = None) -> bool:
         """Check if system resources are available"""
         try:
-            metrics = self._get_system_metrics()
+            if metrics is None:
+                metrics = self._get_latest_metrics()
             
             return all([
                 metrics.get('cpu_percent', 100) < self.resource_limits['cpu_percent'],
@@ -392,6 +451,14 @@ class ResourceManager:
             self.logger.error(f"Error checking resources: {str(e)}")
             return False
     
+    def get_next_task(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Pop the next queued task, waiting up to timeout seconds for one"""
+        with self._not_empty:
+            if not self._not_empty.wait_for(lambda: self._task_heap, timeout):
+                return None
+            _, _, task = heapq.heappop(self._task_heap)
+            return task
+    
     def get_queued_tasks(self) -> int:
         """Get number of tasks in queue"""
-        return self.task_queue.qsize()
\ No newline at end of file
+        return len(self._task_heap)
\ No newline at end of file
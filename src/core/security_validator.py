@@ -4,14 +4,94 @@ from pathlib import Path
 import json
 import re
 import hashlib
+import struct
 import time
 from datetime import datetime
 import sqlite3
 import threading
+from collections import OrderedDict
+from functools import cached_property
 from concurrent.futures import ThreadPoolExecutor
 import os
 from cryptography.fernet import Fernet
 import base64
+import numpy as np
+
+try:
+	import hyperscan
+except ImportError:  # Optional SIMD multi-pattern matcher
+	hyperscan = None
+	
+try:
+	import orjson
+
+	def _json_dumps(obj) -> bytes:
+		# Stdlib json accepts int/float/bool dict keys; orjson needs the option
+		return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+	def _canonical_dumps(obj) -> bytes:
+		return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+
+	_json_loads = orjson.loads
+except ImportError:  # Fall back to the stdlib encoder
+	def _json_dumps(obj) -> bytes:
+		return json.dumps(obj, separators=(',', ':'), default=str).encode()
+
+	def _canonical_dumps(obj) -> bytes:
+		return json.dumps(obj, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode()
+
+	_json_loads = json.loads
+	
+try:
+	import blake3
+except ImportError:  # Optional SIMD hash; hashlib.blake2b is used otherwise
+	blake3 = None
+
+_INSERT_INCIDENT = '''INSERT INTO security_incidents
+					(timestamp, threat_type, severity, details)
+					VALUES (?, ?, ?, ?)'''
+_INSERT_VALIDATION = '''INSERT INTO validations (timestamp, risk_score)
+					VALUES (?, ?)'''
+# Keeps only the newest N validations, as the in-memory history used to
+_PRUNE_VALIDATIONS = '''DELETE FROM validations
+					WHERE id <= (SELECT max(id) - ? FROM validations)'''
+# Validation totals ride along on every incident row (or a single NULL row)
+_SELECT_REPORT_SUMMARY = '''
+	WITH totals AS (
+		SELECT COUNT(*) AS total, COALESCE(SUM(risk_score > ?), 0) AS high_risk
+		FROM validations
+	)
+	SELECT i.threat_type, COUNT(i.id), AVG(i.severity), t.total, t.high_risk
+	FROM totals t
+	LEFT JOIN security_incidents i
+		ON i.timestamp > datetime('now', '-7 days')
+	GROUP BY i.threat_type
+'''
+_SELECT_DAILY_INCIDENTS = '''
+	SELECT DATE(timestamp) as date, COUNT(*) as count
+	FROM security_incidents
+	GROUP BY DATE(timestamp)
+	ORDER BY date DESC
+	LIMIT 30
+'''
+
+_SQLI_RE = re.compile(r'SELECT.*WHERE.*=\s*[\'"].*[\'"]\s*\+')
+_CRED_RES = [
+	re.compile(r'password\s*=\s*[\'"][^\'"]+[\'"]', re.IGNORECASE),
+	re.compile(r'api_key\s*=\s*[\'"][^\'"]+[\'"]', re.IGNORECASE),
+	re.compile(r'secret\s*=\s*[\'"][^\'"]+[\'"]', re.IGNORECASE)
+]
+# Literal keywords every blacklist / custom-rule match must contain
+_BLACKLIST_TOKENS = ('eval', 'exec', 'os.', 'subprocess', '__import__', 'input', 'open')
+_CUSTOM_RULE_TOKENS = ('select', 'password', 'api_key', 'secret')
+_REGEX_METACHARS = set('.^$*+?{}[]\\|()')
+# Cached properties built from risk_patterns; dropped when the patterns change
+_RISK_PATTERN_DERIVED = ('_risk_res', '_fused_pattern', '_hs_id_to_meta', '_hs_patterns_db', '_prefilter_re')
+
+def _canonical(data: Dict) -> bytes:
+	"""Canonical byte form of a session dict for signing (excludes the signature)"""
+	# JSON keeps value types and field boundaries apart, so distinct dicts can't collide
+	return _canonical_dumps({k: v for k, v in data.items() if k != 'signature'})
 
 class SecurityValidationError(Exception):
 	"""Custom exception for security validation errors"""
@@ -20,41 +100,129 @@ class SecurityValidationError(Exception):
 class SecurityValidator:
 	def __init__(self):
 		self.logger = logging.getLogger(__name__)
-		self.security_db = self._initialize_security_db()
-		self.risk_patterns = self._load_risk_patterns()
-		self.validation_history = []
-		self.encryption_key = self._load_or_generate_key()
-		self.cipher_suite = Fernet(self.encryption_key)
-		self.security_config = self._load_security_config()
 		self.threat_levels = {
 			'low': 0.3,
 			'medium': 0.6,
 			'high': 0.8,
 			'critical': 0.95
 		}
-		self._pattern_cache = {}
-		self._lock = threading.Lock()
-		self._blacklisted_patterns = set()
+		self._pattern_cache = OrderedDict()  # blake2b(code) -> scanned risks, LRU order
+		self._pattern_cache_size = 4096
+		self._pattern_cache_lock = threading.Lock()
+		self._risk_patterns = None  # Loaded on first use
+		self._db_lock = threading.Lock()  # Serializes use of the shared connection
+		self._init_lock = threading.Lock()  # Guards one-time creation of the DB and key
+		self._pending_validations = []  # (timestamp, risk_score) rows guarded by _db_lock
+		self._validation_flush_size = 100
+		self._max_validation_rows = 1000
+		self._blacklist_re = None
+		self._hs_blacklist_db = None
+		self._hs_local = threading.local()  # Per-thread Hyperscan scratch spaces
 		self._initialize_blacklist()
 		
+	# Files, keys and compiled patterns are loaded on first use
+	
+	@cached_property
+	def security_db(self) -> sqlite3.Connection:
+		return self._init_once('security_db', self._initialize_security_db)
+		
+	@property
+	def risk_patterns(self) -> Dict:
+		if self._risk_patterns is None:
+			self._risk_patterns = self._load_risk_patterns()
+		return self._risk_patterns
+		
+	@risk_patterns.setter
+	def risk_patterns(self, patterns: Dict):
+		"""Replace the risk patterns, dropping compiled forms and cached scans"""
+		self._risk_patterns = patterns
+		for name in _RISK_PATTERN_DERIVED:
+			self.__dict__.pop(name, None)
+		with self._pattern_cache_lock:
+			self._pattern_cache.clear()
+			
+	def reload_risk_patterns(self):
+		"""Re-read risk patterns from the config file"""
+		self.risk_patterns = self._load_risk_patterns()
+		
+	@cached_property
+	def security_config(self) -> Dict:
+		return self._load_security_config()
+		
+	@cached_property
+	def encryption_key(self) -> bytes:
+		return self._init_once('encryption_key', self._load_or_generate_key)
+		
+	@cached_property
+	def cipher_suite(self) -> Fernet:
+		return Fernet(self.encryption_key)
+		
+	@cached_property
+	def _signature_hasher(self):
+		"""Keyed BLAKE2b state; copied per signature instead of rehashing the key"""
+		return hashlib.blake2b(key=self.encryption_key[:64], digest_size=32)
+		
+	@cached_property
+	def _risk_res(self) -> Dict[str, List[tuple]]:
+		return self._compile_risk_patterns(self.risk_patterns)
+		
+	@cached_property
+	def _fused_pattern(self) -> Optional[re.Pattern]:
+		return self._build_fused_pattern(self.risk_patterns)
+		
+	@cached_property
+	def _hs_id_to_meta(self) -> List[tuple]:
+		return [
+			(category, pattern)
+			for category, patterns in self.risk_patterns.items()
+			for pattern in patterns
+		]
+		
+	@cached_property
+	def _hs_patterns_db(self):
+		return self._build_hyperscan_db([pattern for _, pattern in self._hs_id_to_meta])
+		
+	@cached_property
+	def _prefilter_re(self) -> Optional[re.Pattern]:
+		return self._build_prefilter(self.risk_patterns)
+		
+	def _init_once(self, name: str, factory):
+		"""Build a shared resource once, even when first used from several threads"""
+		# cached_property has no lock on Python 3.12+, so racing threads could each
+		# open a connection or write a different key file
+		with self._init_lock:
+			value = self.__dict__.get(name)
+			if value is None:
+				value = self.__dict__[name] = factory()
+			return value
+			
 	def _initialize_blacklist(self):
 		"""Initialize security blacklist"""
-		self._blacklisted_patterns = {
+		blacklisted_patterns = [
 			r'(eval|exec)\s*\([\'"]',
 			r'os\.(system|popen|exec)',
 			r'subprocess\.(call|Popen)',
 			r'__import__\s*\(',
 			r'input\s*\(',
 			r'open\s*\(.+,\s*[\'"]w[\'"]\)'
-		}
+		]
+		self._blacklist_re = re.compile(
+			'|'.join(f"(?:{p})" for p in blacklisted_patterns), re.IGNORECASE
+		)
+		self._hs_blacklist_db = self._build_hyperscan_db(blacklisted_patterns, single_match=True)
 		
 	def _initialize_security_db(self) -> sqlite3.Connection:
 		"""Initialize security database"""
 		db_path = Path(__file__).parent.parent.parent / 'data' / 'security.db'
 		db_path.parent.mkdir(exist_ok=True)
-		conn = sqlite3.connect(str(db_path))
+		conn = sqlite3.connect(str(db_path), check_same_thread=False, cached_statements=256)
 		c = conn.cursor()
 		
+		# WAL with NORMAL sync avoids an fsync per commit; fine for an incident log
+		for pragma in ("journal_mode=WAL", "synchronous=NORMAL", "temp_store=MEMORY",
+					   "cache_size=-20000", "mmap_size=268435456"):
+			c.execute(f"PRAGMA {pragma}")
+		
 		c.execute('''CREATE TABLE IF NOT EXISTS security_incidents
 					(id INTEGER PRIMARY KEY, timestamp TEXT,
 					 threat_type TEXT, severity REAL,
@@ -64,21 +232,124 @@ class SecurityValidator:
 					(id INTEGER PRIMARY KEY, pattern_type TEXT,
 					 pattern_data TEXT, last_updated TEXT)''')
 					 
+		c.execute('''CREATE TABLE IF NOT EXISTS validations
+					(id INTEGER PRIMARY KEY, timestamp TEXT,
+					 risk_score REAL)''')
+					 
+		c.execute('''CREATE INDEX IF NOT EXISTS idx_incidents_ts
+					ON security_incidents(timestamp)''')
+					 
 		conn.commit()
 		return conn
 		
+	def _build_prefilter(self, risk_patterns: Dict) -> Optional[re.Pattern]:
+		"""Build a keyword scan that must hit before any regex check can match"""
+		tokens = set(_BLACKLIST_TOKENS) | set(_CUSTOM_RULE_TOKENS)
+		for patterns in risk_patterns.values():
+			for pattern in patterns:
+				token = self._literal_prefix(pattern)
+				if token is None:
+					return None  # Can't bound this pattern; always run the full scan
+				tokens.add(token.lower())
+		return re.compile('|'.join(map(re.escape, sorted(tokens))), re.IGNORECASE)
+		
+	def _literal_prefix(self, pattern: str) -> Optional[str]:
+		"""Get the literal text a pattern must start with, if any"""
+		prefix = []
+		for char in pattern:
+			if char in _REGEX_METACHARS:
+				# A quantifier makes the preceding character optional/repeated
+				if char in '?*{' and prefix:
+					prefix.pop()
+				break
+			prefix.append(char)
+		if '|' in pattern or len(prefix) < 2:
+			return None
+		return ''.join(prefix)
+		
 	def _load_risk_patterns(self) -> Dict:
 		"""Load security risk patterns"""
 		try:
 			patterns_path = Path(__file__).parent.parent.parent / 'config' / 'security_patterns.json'
 			if patterns_path.exists():
 				with open(patterns_path) as f:
-					return json.load(f)
+					return _json_loads(f.read())
 			return self._get_default_patterns()
 		except Exception as e:
 			self.logger.error(f"Failed to load risk patterns: {str(e)}")
 			return self._get_default_patterns()
 			
+	def _compile_risk_patterns(self, risk_patterns: Dict) -> Dict[str, List[tuple]]:
+		"""Precompile risk patterns as (source, compiled) pairs per category"""
+		return {
+			category: [(pattern, re.compile(pattern, re.IGNORECASE)) for pattern in patterns]
+			for category, patterns in risk_patterns.items()
+		}
+		
+	def _build_fused_pattern(self, risk_patterns: Dict) -> Optional[re.Pattern]:
+		"""Fuse all risk patterns into one alternation that detects any match"""
+		alternatives = [
+			f"(?:{pattern})"
+			for patterns in risk_patterns.values()
+			for pattern in patterns
+		]
+		try:
+			return re.compile('|'.join(alternatives), re.IGNORECASE)
+		except re.error as e:
+			# Patterns with inline flags or clashing group names can't be fused
+			self.logger.warning(f"Risk patterns can't be fused, scanning each one: {str(e)}")
+			return None
+		
+	def _build_hyperscan_db(self, patterns: List[str], single_match: bool = False):
+		"""Compile patterns into a Hyperscan block-mode database if available"""
+		if hyperscan is None or not patterns:
+			return None
+		flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST
+		if single_match:
+			flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+		try:
+			db = hyperscan.Database()
+			db.compile(
+				expressions=[pattern.encode() for pattern in patterns],
+				ids=list(range(len(patterns))),
+				elements=len(patterns),
+				flags=[flags] * len(patterns)
+			)
+			return db
+		except Exception as e:
+			self.logger.warning(f"Hyperscan compile failed, using re: {str(e)}")
+			return None
+			
+	def _hyperscan_scratch(self, db):
+		"""Get this thread's scratch for a database; scratch can't serve two scans at once"""
+		scratches = self._hs_local.__dict__
+		entry = scratches.get(id(db))
+		# Holding db keeps its id from being reused by a database built on reload
+		if entry is None or entry[0] is not db:
+			entry = scratches[id(db)] = (db, hyperscan.Scratch(db))
+		return entry[1]
+		
+	def _hyperscan_matches(self, code: str) -> List[tuple]:
+		"""Scan with Hyperscan, keeping re-style non-overlapping matches per pattern"""
+		longest = {}
+		
+		def on_match(pattern_id, start, end, flags, context):
+			key = (pattern_id, start)
+			if end > longest.get(key, -1):
+				longest[key] = end
+				
+		db = self._hs_patterns_db
+		db.scan(code.encode(), match_event_handler=on_match, scratch=self._hyperscan_scratch(db))
+		
+		matches = []
+		last_end = {}
+		# Pattern-then-offset order matches the per-pattern re scan
+		for (pattern_id, start), end in sorted(longest.items()):
+			if start >= last_end.get(pattern_id, 0):
+				matches.append((pattern_id, start, end))
+				last_end[pattern_id] = end
+		return matches
+		
 	def _get_default_patterns(self) -> Dict:
 		"""Get default security patterns"""
 		return {
@@ -114,13 +385,13 @@ class SecurityValidator:
 	def encrypt_sensitive_data(self, data: Dict) -> Dict:
 		"""Encrypt sensitive data"""
 		try:
-			encrypted_data = {}
-			for key, value in data.items():
-				if key in self.security_config['sensitive_fields']:
-					encrypted_value = self.cipher_suite.encrypt(str(value).encode())
-					encrypted_data[key] = base64.b64encode(encrypted_value).decode()
-				else:
-					encrypted_data[key] = value
+			sensitive_fields = self.security_config['sensitive_fields']
+			sensitive = {k: v for k, v in data.items() if k in sensitive_fields}
+			encrypted_data = {k: v for k, v in data.items() if k not in sensitive_fields}
+			if sensitive:
+				# One Fernet token for all sensitive fields
+				payload = _json_dumps(sensitive)
+				encrypted_data['__enc__'] = self.cipher_suite.encrypt(payload).decode()
 			return encrypted_data
 		except Exception as e:
 			self.logger.error(f"Encryption failed: {str(e)}")
@@ -129,6 +400,13 @@ class SecurityValidator:
 	def decrypt_sensitive_data(self, data: Dict) -> Dict:
 		"""Decrypt sensitive data"""
 		try:
+			if '__enc__' in data:
+				decrypted_data = {k: v for k, v in data.items() if k != '__enc__'}
+				payload = self.cipher_suite.decrypt(data['__enc__'].encode())
+				decrypted_data.update(_json_loads(payload))
+				return decrypted_data
+				
+			# Legacy layout: each sensitive field encrypted separately
 			decrypted_data = {}
 			for key, value in data.items():
 				if key in self.security_config['sensitive_fields']:
@@ -155,10 +433,9 @@ class SecurityValidator:
 			
 	def _compute_signature(self, data: Dict) -> str:
 		"""Compute data signature"""
-		data_str = json.dumps(data, sort_keys=True)
-		return hashlib.sha256(
-			(data_str + self.encryption_key.decode()).encode()
-		).hexdigest()
+		hasher = self._signature_hasher.copy()
+		hasher.update(_canonical(data))
+		return hasher.hexdigest()
 		
 	def _load_security_config(self) -> Dict:
 		"""Load security configuration"""
@@ -166,7 +443,7 @@ class SecurityValidator:
 			config_path = Path(__file__).parent.parent.parent / 'config' / 'security_config.json'
 			if config_path.exists():
 				with open(config_path) as f:
-					return json.load(f)
+					return _json_loads(f.read())
 			return self._create_default_security_config()
 		except:
 			return self._create_default_security_config()
@@ -182,7 +459,7 @@ class SecurityValidator:
 				'api_key'
 			],
 			'encryption_algorithm': 'Fernet',
-			'signature_algorithm': 'SHA256',
+			'signature_algorithm': 'BLAKE2b',
 			'session_timeout': 3600,
 			'max_failed_attempts': 3
 		}
@@ -190,36 +467,23 @@ class SecurityValidator:
 	def validate_code(self, code: str, context: Dict = None) -> Dict:
 		"""Validate code with enhanced security checks"""
 		try:
-			with self._lock:
-				risks = []
-				total_risk_score = 0.0
-				
-				# Check for immediate security violations
-				if self._check_blacklist(code):
-					raise SecurityValidationError("Code contains blacklisted patterns")
-					
-				# Check for known risk patterns
-				pattern_risks = self._check_patterns(code)
-				risks.extend(pattern_risks)
-				
-				# Check for custom security rules
-				custom_risks = self._check_custom_rules(code)
-				risks.extend(custom_risks)
-				
-				# Calculate total risk score
-				total_risk_score = sum(risk['severity'] for risk in risks)
-				
-				# Record validation result
-				result = {
-					'risks': risks,
-					'risk_score': min(total_risk_score, 1.0),
-					'timestamp': datetime.now().isoformat(),
-					'validation_id': self._generate_validation_id(code)
-				}
-				
-				self._record_validation(result, context)
-				return result
-				
+			risks = self._get_cached_risks(code)
+			
+			# Calculate total risk score
+			total_risk_score = sum(risk['severity'] for risk in risks)
+			
+			# Record validation result; one clock read feeds both timestamp and id
+			t_ns = time.time_ns()
+			result = {
+				'risks': risks,
+				'risk_score': min(total_risk_score, 1.0),
+				'timestamp': datetime.fromtimestamp(t_ns / 1e9).isoformat(),
+				'validation_id': self._generate_validation_id(code, t_ns)
+			}
+			
+			self._record_validation(result, context)
+			return result
+			
 		except SecurityValidationError as e:
 			self.logger.error(f"Security validation failed: {str(e)}")
 			return {
@@ -230,35 +494,101 @@ class SecurityValidator:
 			self.logger.error(f"Unexpected error in validation: {str(e)}")
 			return {'risks': [], 'risk_score': 0.0}
 			
+	def _get_cached_risks(self, code: str) -> List[Dict]:
+		"""Scan code for risks, reusing results for previously seen code"""
+		key = hashlib.blake2b(code.encode(), digest_size=16).digest()
+		with self._pattern_cache_lock:
+			cached = self._pattern_cache.get(key)
+			if cached is not None:
+				self._pattern_cache.move_to_end(key)
+				
+		if cached is None:
+			cached = self._scan_risks(code)
+			with self._pattern_cache_lock:
+				self._pattern_cache[key] = cached
+				if len(self._pattern_cache) > self._pattern_cache_size:
+					self._pattern_cache.popitem(last=False)
+					
+		blacklisted, risks = cached
+		if blacklisted:
+			raise SecurityValidationError("Code contains blacklisted patterns")
+		return [dict(risk) for risk in risks]  # Callers may mutate their copy
+		
+	def _scan_risks(self, code: str) -> tuple:
+		"""Run the pattern checks; returns (blacklisted, risks)"""
+		risks = []
+		
+		# Code without any pattern keyword can't match; skip the regex sweep
+		if self._prefilter_re is None or self._prefilter_re.search(code):
+			# Check for immediate security violations
+			if self._check_blacklist(code):
+				return True, []
+				
+			# Check for known risk patterns
+			risks.extend(self._check_patterns(code))
+			
+			# Check for custom security rules
+			risks.extend(self._check_custom_rules(code))
+			
+		return False, risks
+		
 	def _check_blacklist(self, code: str) -> bool:
 		"""Check for blacklisted patterns"""
-		return any(re.search(pattern, code, re.IGNORECASE) 
-				  for pattern in self._blacklisted_patterns)
+		# Hyperscan only folds ASCII case; re.IGNORECASE also catches e.g. 'ſubprocess'
+		if self._hs_blacklist_db is not None and code.isascii():
+			hits = []
+			db = self._hs_blacklist_db
+			db.scan(
+				code.encode(),
+				match_event_handler=lambda pattern_id, start, end, flags, context: hits.append(pattern_id),
+				scratch=self._hyperscan_scratch(db)
+			)
+			return bool(hits)
+		return self._blacklist_re.search(code) is not None
 				  
 	def _check_patterns(self, code: str) -> List[Dict]:
 		"""Check for known risk patterns"""
+		# Hyperscan reports byte offsets, which only line up with str indices for ASCII
+		if self._hs_patterns_db is not None and code.isascii():
+			risks = []
+			for pattern_id, start, end in self._hyperscan_matches(code):
+				category, pattern = self._hs_id_to_meta[pattern_id]
+				risks.append(self._build_pattern_risk(code, category, pattern, start, end))
+			return risks
+			
+		# One pass over the fused alternation rules out code that matches nothing.
+		# It can't report the hits themselves: alternation matches don't overlap,
+		# so a pattern overlapping an earlier hit would be missed.
+		fused_re = self._fused_pattern
+		if fused_re is not None and fused_re.search(code) is None:
+			return []
+		return self._check_patterns_individually(code)
+		
+	def _check_patterns_individually(self, code: str) -> List[Dict]:
+		"""Check risk patterns one at a time"""
 		risks = []
-		for category, patterns in self.risk_patterns.items():
-			for pattern in patterns:
-				matches = re.finditer(pattern, code, re.IGNORECASE)
-				for match in matches:
-					risk = {
-						'type': category,
-						'pattern': pattern,
-						'location': match.span(),
-						'severity': self._calculate_severity(category, match.group()),
-						'context': code[max(0, match.start()-20):
-									 min(len(code), match.end()+20)]
-					}
-					risks.append(risk)
+		for category, patterns in self._risk_res.items():
+			for pattern, compiled in patterns:
+				for match in compiled.finditer(code):
+					risks.append(self._build_pattern_risk(code, category, pattern, *match.span()))
 		return risks
 		
+	def _build_pattern_risk(self, code: str, category: str, pattern: str, start: int, end: int) -> Dict:
+		"""Build the risk entry for a pattern match"""
+		return {
+			'type': category,
+			'pattern': pattern,
+			'location': (start, end),
+			'severity': self._calculate_severity(category, code[start:end]),
+			'context': code[max(0, start-20):min(len(code), end+20)]
+		}
+		
 	def _check_custom_rules(self, code: str) -> List[Dict]:
 		"""Check custom security rules"""
 		risks = []
 		
 		# Check for potential SQL injection
-		if re.search(r'SELECT.*WHERE.*=\s*[\'"].*[\'"]\s*\+', code):
+		if _SQLI_RE.search(code):
 			risks.append({
 				'type': 'sql_injection',
 				'severity': 0.9,
@@ -266,14 +596,8 @@ class SecurityValidator:
 			})
 			
 		# Check for hardcoded credentials
-		credential_patterns = [
-			r'password\s*=\s*[\'"][^\'"]+[\'"]',
-			r'api_key\s*=\s*[\'"][^\'"]+[\'"]',
-			r'secret\s*=\s*[\'"][^\'"]+[\'"]'
-		]
-		
-		for pattern in credential_patterns:
-			if re.search(pattern, code, re.IGNORECASE):
+		for pattern in _CRED_RES:
+			if pattern.search(code):
 				risks.append({
 					'type': 'hardcoded_credentials',
 					'severity': 0.8,
@@ -282,11 +606,16 @@ class SecurityValidator:
 				
 		return risks
 		
-	def _generate_validation_id(self, code: str) -> str:
+	def _generate_validation_id(self, code: str, t_ns: int) -> str:
 		"""Generate unique validation ID"""
-		return hashlib.sha256(
-			f"{code}{time.time()}".encode()
-		).hexdigest()[:16]
+		timestamp = struct.pack('<q', t_ns)
+		if blake3 is not None:
+			hasher = blake3.blake3(code.encode())
+			hasher.update(timestamp)
+			return hasher.hexdigest(length=8)
+		hasher = hashlib.blake2b(code.encode(), digest_size=8)
+		hasher.update(timestamp)
+		return hasher.hexdigest()
 			
 	def validate_action(self, action: Dict) -> Dict:
 		"""Validate browser automation action"""
@@ -351,82 +680,110 @@ class SecurityValidator:
 	def _record_validation(self, result: Dict, context: Dict = None):
 		"""Record validation result"""
 		try:
-			c = self.security_db.cursor()
-			for risk in result['risks']:
-				c.execute('''INSERT INTO security_incidents
-							(timestamp, threat_type, severity, details)
-							VALUES (?, ?, ?, ?)''',
-							(result['timestamp'],
-							 risk['type'],
-							 risk['severity'],
-							 json.dumps({
-								 'pattern': risk['pattern'],
-								 'location': risk['location'],
-								 'context': context
-							 })))
-							 
-			self.security_db.commit()
-			
-			# Update validation history
-			self.validation_history.append({
-				'timestamp': result['timestamp'],
-				'risk_score': result['risk_score'],
-				'context': context
-			})
+			rows = [
+				(result['timestamp'],
+				 risk['type'],
+				 risk['severity'],
+				 _json_dumps({
+					 'pattern': risk.get('pattern'),
+					 'location': risk.get('location'),
+					 'context': context
+				 }))
+				for risk in result['risks']
+			]
 			
-			# Keep history manageable
-			if len(self.validation_history) > 1000:
-				self.validation_history = self.validation_history[-1000:]
+			with self._db_lock:
+				self._pending_validations.append((result['timestamp'], result['risk_score']))
+				# Clean validations are batched; incidents are written right away
+				if not rows and len(self._pending_validations) < self._validation_flush_size:
+					return
+					
+				# One transaction for the pending validations and all incidents
+				with self.security_db:
+					self._flush_validations()
+					if rows:
+						self.security_db.executemany(_INSERT_INCIDENT, rows)
 				
 		except Exception as e:
 			self.logger.error(f"Failed to record validation: {str(e)}")
 			
+	def _flush_validations(self):
+		"""Write batched validation rows and prune old ones (caller holds _db_lock)"""
+		if not self._pending_validations:
+			return
+		self.security_db.executemany(_INSERT_VALIDATION, self._pending_validations)
+		self._pending_validations.clear()
+		self.security_db.execute(_PRUNE_VALIDATIONS, (self._max_validation_rows,))
+			
 	def get_security_report(self) -> Dict:
 		"""Generate comprehensive security report"""
 		try:
-			with self._lock:
+			# Both report queries share one lock hold and cursor
+			with self._db_lock:
+				with self.security_db:
+					self._flush_validations()
 				c = self.security_db.cursor()
-				recent_incidents = c.execute('''
-					SELECT threat_type, COUNT(*), AVG(severity)
-					FROM security_incidents
-					WHERE timestamp > datetime('now', '-7 days')
-					GROUP BY threat_type
-				''').fetchall()
-				
-				# Analyze trends
-				trend_analysis = self._analyze_security_trends()
-				
-				return {
-					'recent_incidents': [
-						{
-							'type': threat_type,
-							'count': count,
-							'avg_severity': severity
-						}
-						for threat_type, count, severity in recent_incidents
-					],
-					'total_validations': len(self.validation_history),
-					'high_risk_count': sum(1 for v in self.validation_history
-										 if v['risk_score'] > self.threat_levels['high']),
-					'trends': trend_analysis,
-					'recommendations': self._generate_security_recommendations()
+				summary = c.execute(
+					_SELECT_REPORT_SUMMARY, (self.threat_levels['high'],)
+				).fetchall()
+				daily_counts = c.execute(_SELECT_DAILY_INCIDENTS).fetchall()
+			total_validations, high_risk_count = summary[0][3:] if summary else (0, 0)
+			
+			# Analyze trends
+			trend_analysis = self._analyze_security_trends(daily_counts)
+			
+			recent_incidents = [
+				{
+					'type': threat_type,
+					'count': count,
+					'avg_severity': severity
 				}
-				
+				for threat_type, count, severity, _, _ in summary
+				if threat_type is not None
+			]
+			
+			return {
+				'recent_incidents': recent_incidents,
+				'total_validations': total_validations,
+				'high_risk_count': high_risk_count,
+				'trends': trend_analysis,
+				'recommendations': self._generate_security_recommendations(
+					recent_incidents, trend_analysis
+				)
+			}
+			
 		except Exception as e:
 			self.logger.error(f"Failed to generate security report: {str(e)}")
 			return {}
 			
-	def _analyze_security_trends(self) -> Dict:
+	def _generate_security_recommendations(self, recent_incidents: List[Dict], trends: Dict) -> List[Dict]:
+		"""Generate security recommendations from recent incidents"""
+		recommendations = []
+		
+		for incident in recent_incidents:
+			if incident['avg_severity'] >= self.threat_levels['high']:
+				recommendations.append({
+					'threat_type': incident['type'],
+					'issue': 'High severity incidents in the last 7 days',
+					'suggestion': 'Review the sources producing these risks'
+				})
+				
+		if trends.get('trend') == 'increasing':
+			recommendations.append({
+				'threat_type': None,
+				'issue': 'Daily incident count is increasing',
+				'suggestion': 'Tighten validation thresholds'
+			})
+			
+		return recommendations
+		
+	def _analyze_security_trends(self, daily_counts: Optional[List[tuple]] = None) -> Dict:
 		"""Analyze security incident trends"""
 		try:
-			c = self.security_db.cursor()
-			daily_counts = c.execute('''
-				SELECT DATE(timestamp) as date, COUNT(*) as count
-				FROM security_incidents
-				GROUP BY DATE(timestamp)
-				ORDER BY date DESC
-				LIMIT 30
-			''').fetchall()
+			if daily_counts is None:
+				with self._db_lock:
+					c = self.security_db.cursor()
+					daily_counts = c.execute(_SELECT_DAILY_INCIDENTS).fetchall()
 			
 			return {
 				'daily_incidents': [
@@ -444,12 +801,10 @@ class SecurityValidator:
 		if len(values) < 2:
 			return 'stable'
 			
-		avg_first_half = sum(values[:len(values)//2]) / (len(values)//2)
-		avg_second_half = sum(values[len(values)//2:]) / (len(values) - len(values)//2)
-		
-		diff = avg_second_half - avg_first_half
-		if diff > 0.1:
+		arr = np.asarray(values, dtype=np.float32)
+		slope = np.polyfit(np.arange(arr.size), arr, 1)[0]
+		if slope > 0.1:
 			return 'increasing'
-		elif diff < -0.1:
+		elif slope < -0.1:
 			return 'decreasing'
 		return 'stable'
\ No newline at end of file
@@ -0,0 +1,167 @@
+import gc
+import sqlite3
+
+import pytest
+
+from . import performance_profiler
+from .performance_profiler import PerformanceProfiler
+
+@pytest.fixture
+def db_path(monkeypatch, tmp_path):
+    # The database lives at <module dir>/../../data; point that into tmp_path
+    monkeypatch.setattr(performance_profiler, '__file__', str(tmp_path / 'src' / 'core' / 'performance_profiler.py'))
+    return tmp_path / 'data' / 'profiling.db'
+    
+@pytest.fixture
+def profiler(db_path):
+    profiler = PerformanceProfiler()
+    yield profiler
+    profiler.close()
+    
+def _record(profiler, func_name, execution_time):
+    profiler._record_execution_metric(
+        func_name, execution_time, {'timestamp': 'now'}, success=True
+    )
+    
+def test_report_is_cached_until_next_write(profiler, monkeypatch):
+    _record(profiler, 'fetch', 0.5)
+    calls = []
+    generate = profiler._generate_recommendations
+    monkeypatch.setattr(profiler, '_generate_recommendations', lambda: calls.append(None) or generate())
+    
+    first = profiler.get_performance_report()
+    assert profiler.get_performance_report() == first
+    assert len(calls) == 1
+    
+    _record(profiler, 'fetch', 1.5)
+    report = profiler.get_performance_report()
+    assert len(calls) == 2
+    assert report['metrics']['fetch']['count'] == 2
+    assert report['metrics']['fetch']['mean'] == pytest.approx(1.0)
+    
+def test_report_copies_are_isolated(profiler):
+    _record(profiler, 'fetch', 0.5)
+    report = profiler.get_performance_report()
+    report['metrics']['fetch']['count'] = 99
+    report['recommendations'].append('bogus')
+    
+    again = profiler.get_performance_report()
+    assert again['metrics']['fetch']['count'] == 1
+    assert again['recommendations'] == []
+    
+def test_trend_is_cached_per_sample_count(profiler, monkeypatch):
+    for i in range(profiler.learning_threshold):
+        _record(profiler, 'slow', 0.01 * i)
+    calls = []
+    calculate = profiler._calculate_trend
+    monkeypatch.setattr(profiler, '_calculate_trend', lambda data: calls.append(None) or calculate(data))
+    
+    trend = profiler._get_cached_trend('slow')
+    assert trend['direction'] == 'degrading'
+    assert trend['confidence'] == pytest.approx(1.0)
+    assert profiler._get_cached_trend('slow') is trend
+    assert len(calls) == 1
+    
+    _record(profiler, 'slow', 0.0)
+    profiler._get_cached_trend('slow')
+    assert len(calls) == 2
+    
+def test_degrading_function_is_recommended(profiler):
+    for i in range(profiler.learning_threshold):
+        _record(profiler, 'slow', 0.01 * i)
+    assert [r['function'] for r in profiler.get_performance_report()['recommendations']] == ['slow']
+    
+def test_samples_unroll_in_chronological_order(profiler):
+    total = profiler._buffer_size + 6
+    for i in range(total):
+        _record(profiler, 'fetch', float(i))
+        
+    samples = profiler._get_samples('fetch')
+    assert samples.tolist() == [float(i) for i in range(total - profiler._buffer_size, total)]
+    assert profiler.metrics['fetch'].tolist() == samples.tolist()
+    
+def test_samples_before_wrap(profiler):
+    for i in range(3):
+        _record(profiler, 'fetch', float(i))
+    assert profiler._get_samples('fetch').tolist() == [0.0, 1.0, 2.0]
+    assert profiler._get_samples('unknown').size == 0
+    
+def _stored_rows(db_path):
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return conn.execute('SELECT COUNT(*) FROM execution_metrics').fetchone()[0]
+    finally:
+        conn.close()
+        
+def test_metrics_flush_in_batches(profiler, db_path):
+    for i in range(1030):
+        _record(profiler, 'fetch', float(i))
+    assert _stored_rows(db_path) == 1000
+    assert len(profiler._pending) == 30
+    
+def test_finalizer_flushes_pending_rows(db_path):
+    profiler = PerformanceProfiler()
+    for i in range(1031):
+        _record(profiler, 'fetch', float(i))
+    finalizer = profiler._finalizer
+    del profiler
+    gc.collect()
+    assert not finalizer.alive
+    assert _stored_rows(db_path) == 1031
+    
+class _FailingCursor:
+    """Inserts a few rows of a batch, then fails like a full disk would"""
+    
+    def __init__(self, cursor):
+        self._cursor = cursor
+        
+    def execute(self, *args):
+        return self._cursor.execute(*args)
+        
+    def executemany(self, sql, rows):
+        rows = iter(rows)
+        self._cursor.executemany(sql, [next(rows) for _ in range(3)])
+        raise sqlite3.OperationalError('database or disk is full')
+        
+class _FailingConnection:
+    def __init__(self, conn):
+        self._conn = conn
+        
+    def cursor(self):
+        return _FailingCursor(self._conn.cursor())
+        
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+        
+def test_failed_flush_keeps_rows_queued(profiler, db_path):
+    conn = profiler.profile_db
+    profiler.profile_db = _FailingConnection(conn)
+    for i in range(profiler.config['flush_batch_size']):
+        _record(profiler, 'fetch', float(i))
+    assert len(profiler._pending) == profiler.config['flush_batch_size']
+    assert _stored_rows(db_path) == 0
+    
+    profiler.profile_db = conn
+    profiler._flush_pending()
+    assert not profiler._pending
+    assert _stored_rows(db_path) == profiler.config['flush_batch_size']
+    
+def test_old_database_gains_outcome_columns(db_path):
+    db_path.parent.mkdir()
+    conn = sqlite3.connect(str(db_path))
+    conn.execute('''CREATE TABLE execution_metrics
+                    (id INTEGER PRIMARY KEY, function_name TEXT,
+                     execution_time REAL, timestamp TEXT, context TEXT)''')
+    conn.execute("INSERT INTO execution_metrics VALUES (1, 'old', 0.1, 'then', '{}')")
+    conn.commit()
+    conn.close()
+    
+    profiler = PerformanceProfiler()
+    try:
+        columns = [row[1] for row in profiler.profile_db.execute('PRAGMA table_info(execution_metrics)')]
+        assert columns[-2:] == ['success', 'error']
+        for i in range(profiler.config['flush_batch_size']):
+            _record(profiler, 'fetch', float(i))
+    finally:
+        profiler.close()
+    assert _stored_rows(db_path) == 1 + profiler.config['flush_batch_size']
@@ -0,0 +1,335 @@
+import base64
+import re
+import threading
+import time
+import types
+
+import pytest
+from cryptography.fernet import Fernet
+
+from . import security_validator
+from .security_validator import SecurityValidator
+
+@pytest.fixture
+def validator(monkeypatch):
+	validator = SecurityValidator()
+	# Keep tests off the on-disk security database
+	monkeypatch.setattr(validator, '_record_validation', lambda result, context=None: None)
+	return validator
+	
+def test_overlapping_patterns_are_all_reported(validator):
+	validator.risk_patterns = {
+		'data_exposure': ['password'],
+		'code_injection': [r'password\s*=\s*\w+']
+	}
+	result = validator.validate_code("password = abc")
+	
+	assert [(risk['type'], risk['location']) for risk in result['risks'] if 'pattern' in risk] == [
+		('data_exposure', (0, 8)),
+		('code_injection', (0, 14))
+	]
+	assert result['risk_score'] == 1.0
+	
+def test_code_matching_no_pattern_has_no_pattern_risks(validator):
+	validator.risk_patterns = {'data_exposure': ['password']}
+	assert validator._check_patterns("nothing to see here") == []
+	
+def test_unfusable_patterns_fall_back_to_per_pattern_scan(validator):
+	validator.risk_patterns = {'a': ['(?P<x>foo)'], 'b': ['(?P<x>foobar)']}
+	assert validator._fused_pattern is None
+	assert [risk['pattern'] for risk in validator._check_patterns("foobar")] == [
+		'(?P<x>foo)', '(?P<x>foobar)'
+	]
+	
+def test_concurrent_hyperscan_scans_do_not_fail_open(validator):
+	pytest.importorskip('hyperscan')
+	assert validator._hs_blacklist_db is not None
+	scores = []
+	
+	def worker():
+		for _ in range(100):
+			validator._pattern_cache.clear()
+			scores.append(validator.validate_code("eval('1')")['risk_score'])
+			
+	threads = [threading.Thread(target=worker) for _ in range(8)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	assert scores and all(score == 1.0 for score in scores)
+	
+# Blacklist as it stood before the prefilter, fused scan and Hyperscan paths
+_BASELINE_BLACKLIST = [
+	r'(eval|exec)\s*\([\'"]',
+	r'os\.(system|popen|exec)',
+	r'subprocess\.(call|Popen)',
+	r'__import__\s*\(',
+	r'input\s*\(',
+	r'open\s*\(.+,\s*[\'"]w[\'"]\)'
+]
+
+_BASELINE_CREDENTIALS = [
+	r'password\s*=\s*[\'"][^\'"]+[\'"]',
+	r'api_key\s*=\s*[\'"][^\'"]+[\'"]',
+	r'secret\s*=\s*[\'"][^\'"]+[\'"]'
+]
+
+_SAMPLES = [
+	"",
+	"x = 1",
+	"print('hello world')",
+	"eval(x)",
+	"EVAL (x) + exec(y)",
+	"eval('1')",
+	"os.system('ls')",
+	"subprocess.Popen(cmd)",
+	"__import__('os')",
+	"value = input()",
+	"open('f', 'w')",
+	"password = abc",
+	"PASSWORD = 'hunter2'",
+	"api_key='k' and secret = \"s\"",
+	"admin_password sudo_secret root_api_key",
+	"rm -rf /tmp && rm  -RF /",
+	"DELETE FROM users; drop table users",
+	"SELECT * FROM t WHERE name = 'a' + name",
+	"system(cmd); os_system(cmd)",
+	"pässwörd = 'x'; password = 'ü'",
+	"ſubprocess.call(x)",
+	"EVAL('x') + ſecret",
+	"secret" * 50,
+	"no keywords here, just text " * 20
+]
+
+def _baseline_validate(validator, code):
+	"""validate_code's results as computed before the scan optimizations"""
+	if any(re.search(pattern, code, re.IGNORECASE) for pattern in _BASELINE_BLACKLIST):
+		return [{'type': 'critical', 'message': 'Code contains blacklisted patterns', 'severity': 1.0}], 1.0
+		
+	risks = []
+	for category, patterns in validator.risk_patterns.items():
+		for pattern in patterns:
+			for match in re.finditer(pattern, code, re.IGNORECASE):
+				risks.append({
+					'type': category,
+					'pattern': pattern,
+					'location': match.span(),
+					'severity': validator._calculate_severity(category, match.group()),
+					'context': code[max(0, match.start()-20):min(len(code), match.end()+20)]
+				})
+				
+	if re.search(r'SELECT.*WHERE.*=\s*[\'"].*[\'"]\s*\+', code):
+		risks.append({'type': 'sql_injection', 'severity': 0.9, 'message': 'Potential SQL injection detected'})
+	for pattern in _BASELINE_CREDENTIALS:
+		if re.search(pattern, code, re.IGNORECASE):
+			risks.append({'type': 'hardcoded_credentials', 'severity': 0.8, 'message': 'Hardcoded credentials detected'})
+			
+	return risks, min(sum(risk['severity'] for risk in risks), 1.0)
+	
+@pytest.fixture(params=['re', 'hyperscan'])
+def scan_validator(request, validator, monkeypatch):
+	if request.param == 'hyperscan':
+		pytest.importorskip('hyperscan')
+		assert validator._hs_patterns_db is not None
+	else:
+		monkeypatch.setattr(security_validator, 'hyperscan', None)
+		validator._hs_blacklist_db = None
+	return validator
+	
+@pytest.mark.parametrize('code', _SAMPLES)
+def test_validate_code_matches_baseline(scan_validator, code):
+	scan_validator.risk_patterns = scan_validator._get_default_patterns()
+	result = scan_validator.validate_code(code)
+	assert (result['risks'], result['risk_score']) == _baseline_validate(scan_validator, code)
+	
+@pytest.mark.parametrize('pattern, prefix', [
+	('password', 'password'),
+	(r'rm\s+-rf', 'rm'),
+	(r'os\.system', 'os'),
+	('ab+c', 'ab'),
+	('colou?r', 'colo'),
+	('abc?', 'ab'),
+	('ab{0,1}c', None),
+	('xy*z', None),
+	(r'\bpassword', None),
+	('eval|exec', None),
+	('(?i)secret', None),
+	('x', None)
+])
+def test_literal_prefix(validator, pattern, prefix):
+	assert validator._literal_prefix(pattern) == prefix
+	
+@pytest.mark.parametrize('pattern, code', [
+	('colou?r', 'COLOR'),
+	('ab{0,1}c', 'ac'),
+	(r'\bzz', 'zz'),
+	('foo|bar', 'bar'),
+	('qu+ux', 'quuux')
+])
+def test_prefilter_never_hides_a_match(validator, pattern, code):
+	validator.risk_patterns = {'custom': [pattern]}
+	prefilter = validator._prefilter_re
+	if prefilter is not None:
+		assert prefilter.search(code)
+	assert [risk['pattern'] for risk in validator.validate_code(code)['risks']] == [pattern]
+	
+def test_prefilter_skips_code_without_keywords(validator, monkeypatch):
+	validator.risk_patterns = validator._get_default_patterns()
+	monkeypatch.setattr(validator, '_check_blacklist', lambda code: pytest.fail("scan not skipped"))
+	assert validator.validate_code("x = 1")['risks'] == []
+	
+class _FakeHyperscanDatabase:
+	"""Reports every (leftmost start, end) pair like HS_FLAG_SOM_LEFTMOST"""
+	
+	def __init__(self, patterns):
+		self.patterns = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+		
+	def scan(self, data, match_event_handler, scratch=None):
+		text = data.decode()
+		for pattern_id, pattern in enumerate(self.patterns):
+			for end in range(1, len(text) + 1):
+				for start in range(end):
+					if pattern.fullmatch(text, start, end):
+						match_event_handler(pattern_id, start, end, 0, None)
+						break
+						
+@pytest.mark.parametrize('code', [
+	"eval (x) eval(y)",
+	"rm   -rf a; rm -rf b",
+	"secretsecret api_key password",
+	"DELETE   FROM t; delete from u"
+])
+def test_hyperscan_matches_emulate_re(validator, monkeypatch, code):
+	monkeypatch.setattr(security_validator, 'hyperscan', types.SimpleNamespace(Scratch=lambda db: None))
+	validator.risk_patterns = validator._get_default_patterns()
+	validator._hs_patterns_db = _FakeHyperscanDatabase([pattern for _, pattern in validator._hs_id_to_meta])
+	assert validator._check_patterns(code) == validator._check_patterns_individually(code)
+	
+def test_sensitive_fields_round_trip(validator):
+	validator.encryption_key = Fernet.generate_key()
+	data = {'username': 'alice', 'password': 'hunter2', 'token': 'abc', 'retries': 3}
+	
+	encrypted = validator.encrypt_sensitive_data(data)
+	assert set(encrypted) == {'username', 'retries', '__enc__'}
+	assert 'hunter2' not in encrypted['__enc__']
+	assert validator.decrypt_sensitive_data(encrypted) == data
+	
+def test_decrypts_legacy_per_field_layout(validator):
+	validator.encryption_key = Fernet.generate_key()
+	token = validator.cipher_suite.encrypt(b'hunter2')
+	legacy = {'username': 'alice', 'password': base64.b64encode(token).decode()}
+	assert validator.decrypt_sensitive_data(legacy) == {'username': 'alice', 'password': 'hunter2'}
+	
+def test_encryption_key_is_generated_once_across_threads(validator, monkeypatch):
+	calls = []
+	
+	def slow_generate():
+		calls.append(None)
+		time.sleep(0.05)
+		return Fernet.generate_key()
+		
+	monkeypatch.setattr(validator, '_load_or_generate_key', slow_generate)
+	keys = []
+	threads = [threading.Thread(target=lambda: keys.append(validator.encryption_key)) for _ in range(8)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	assert len(calls) == 1
+	assert len(set(keys)) == 1
+	
+@pytest.fixture
+def db_validator(monkeypatch, tmp_path):
+	# The database lives at <module dir>/../../data; point that into tmp_path
+	monkeypatch.setattr(security_validator, '__file__', str(tmp_path / 'src' / 'core' / 'security_validator.py'))
+	return SecurityValidator()
+	
+def _validation_rows(validator):
+	return validator.security_db.execute('SELECT COUNT(*) FROM validations').fetchone()[0]
+	
+def test_clean_validations_are_batched(db_validator):
+	for _ in range(db_validator._validation_flush_size - 1):
+		db_validator.validate_code("x = 1")
+	assert _validation_rows(db_validator) == 0
+	
+	db_validator.validate_code("x = 1")
+	assert _validation_rows(db_validator) == db_validator._validation_flush_size
+	
+def test_incidents_flush_pending_validations(db_validator):
+	db_validator.validate_code("x = 1")
+	db_validator.validate_code("password = abc")
+	assert _validation_rows(db_validator) == 2
+	
+def test_report_counts_only_the_newest_validations(db_validator):
+	db_validator._max_validation_rows = 50
+	for _ in range(120):
+		db_validator.validate_code("x = 1")
+	for _ in range(3):
+		db_validator.validate_code("eval(x)")
+		
+	report = db_validator.get_security_report()
+	assert report['total_validations'] == 50
+	assert report['high_risk_count'] == 3
+	assert _validation_rows(db_validator) == 50
+	assert report['recent_incidents'] == [{'type': 'code_injection', 'count': 3, 'avg_severity': pytest.approx(0.9)}]
+	assert [r['threat_type'] for r in report['recommendations']] == ['code_injection']
+	
+def test_empty_report(db_validator):
+	report = db_validator.get_security_report()
+	assert report['total_validations'] == 0
+	assert report['recent_incidents'] == []
+	assert report['recommendations'] == []
+	
+def test_replacing_risk_patterns_invalidates_derived_state(validator):
+	validator.risk_patterns = {'data_exposure': ['password']}
+	assert validator.validate_code("token = 1")['risks'] == []
+	assert [risk['pattern'] for risk in validator.validate_code("password = 1")['risks']] == ['password']
+	
+	validator.risk_patterns = {'data_exposure': ['token']}
+	assert [risk['pattern'] for risk in validator.validate_code("token = 1")['risks']] == ['token']
+	assert validator.validate_code("password = 1")['risks'] == []
+	
+def test_reload_risk_patterns_reads_config(validator, monkeypatch):
+	validator.risk_patterns = {'data_exposure': ['token']}
+	validator.validate_code("token = 1")
+	monkeypatch.setattr(validator, '_load_risk_patterns', lambda: {'data_exposure': ['password']})
+	
+	validator.reload_risk_patterns()
+	assert validator.validate_code("token = 1")['risks'] == []
+	assert [risk['pattern'] for risk in validator.validate_code("password = 1")['risks']] == ['password']
+	
+def _signed(validator, session):
+	return dict(session, signature=validator._compute_signature(session))
+	
+def test_signed_session_validates(validator):
+	validator.encryption_key = Fernet.generate_key()
+	session = _signed(validator, {'user': 'alice', 'role': 'viewer', 'prefs': {'a': 1, 'b': [1, 2]}})
+	assert validator.validate_session(session)
+	assert not validator.validate_session(dict(session, role='admin'))
+	assert not validator.validate_session({'user': 'alice'})
+	
+def test_separator_payload_cannot_reuse_signature(validator):
+	validator.encryption_key = Fernet.generate_key()
+	signature = _signed(validator, {'user': 'alice', 'role': 'viewer'})['signature']
+	assert not validator.validate_session({'role': 'viewer|user=alice', 'signature': signature})
+	
+def test_value_type_is_signed(validator):
+	validator.encryption_key = Fernet.generate_key()
+	signature = _signed(validator, {'uid': 1})['signature']
+	assert not validator.validate_session({'uid': '1', 'signature': signature})
+	
+def test_nested_key_order_does_not_change_signature(validator):
+	validator.encryption_key = Fernet.generate_key()
+	first = validator._compute_signature({'prefs': {'a': 1, 'b': 2}})
+	assert validator._compute_signature({'prefs': {'b': 2, 'a': 1}}) == first
+	
+def test_incidents_record_non_str_context_keys(db_validator):
+	db_validator.validate_code("x = 1")
+	db_validator.validate_code("password = 'y'", {1: 'a'})
+	
+	details = [
+		security_validator._json_loads(row[0])
+		for row in db_validator.security_db.execute('SELECT details FROM security_incidents')
+	]
+	assert details and all(detail['context'] == {'1': 'a'} for detail in details)
+	assert _validation_rows(db_validator) == 2
@@ -1,31 +1,37 @@
-import tensorflow as tf
-import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-import joblib
-import h5py
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-def test_ml_packages():
+HDF5_SIGNATURE = b'\x89HDF\r\n\x1a\n'
+
+def test_ml_packages(verbose: bool = False):
+	# Heavy frameworks are imported here so importing this module stays cheap
+	import tensorflow as tf
+	import pandas as pd
+	import joblib
+	
 	print("Testing ML packages:")
 	
 	# Test TensorFlow
 	print("\n1. TensorFlow Test:")
 	print(f"TensorFlow version: {tf.__version__}")
-	tensor = tf.constant([[1, 2], [3, 4]])
-	print("TensorFlow tensor:", tensor.numpy())
+	if verbose:
+		tensor = tf.constant([[1, 2], [3, 4]])
+		print("TensorFlow tensor:", tensor.numpy())
 	
 	# Test Pandas
 	print("\n2. Pandas Test:")
 	print(f"Pandas version: {pd.__version__}")
-	df = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})
-	print("Pandas DataFrame:\n", df)
+	if verbose:
+		df = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})
+		print("Pandas DataFrame:\n", df)
 	
 	# Test NumPy
 	print("\n3. NumPy Test:")
 	print(f"NumPy version: {np.__version__}")
-	arr = np.array([[1, 2], [3, 4]])
-	print("NumPy array:\n", arr)
+	if verbose:
+		arr = np.array([[1, 2], [3, 4]])
+		print("NumPy array:\n", arr)
 	
 	# Get absolute paths for models
 	base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -34,19 +40,28 @@ def test_ml_packages():
 	
 	# Test model files existence
 	print("\n4. Testing Model Files:")
+	def _check_advanced_model():
+		# Check the HDF5 signature instead of opening the file with h5py
+		with open(advanced_model_path, 'rb') as f:
+			if f.read(8) != HDF5_SIGNATURE:
+				raise ValueError("not an HDF5 file")
+	
+	# Both probes are independent I/O, so run them concurrently
+	with ThreadPoolExecutor(max_workers=2) as executor:
+		behavior_future = executor.submit(joblib.load, behavior_model_path, mmap_mode='r')
+		advanced_future = executor.submit(_check_advanced_model)
+	
 	try:
-		# Test loading behavior model
-		behavior_model = joblib.load(behavior_model_path)
+		behavior_future.result()
 		print("✓ Behavior model loaded successfully")
 	except Exception as e:
 		print("✗ Error loading behavior model:", str(e))
 		
 	try:
-		# Test loading advanced model
-		with h5py.File(advanced_model_path, 'r') as f:
-			print("✓ Advanced model file exists and is readable")
+		advanced_future.result()
+		print("✓ Advanced model file exists and is readable")
 	except Exception as e:
 		print("✗ Error accessing advanced model:", str(e))
 
 if __name__ == "__main__":
-	test_ml_packages()
\ No newline at end of file
+	test_ml_packages(verbose=True)
\ No newline at end of file
@@ -1,8 +1,11 @@
-import tensorflow as tf
-
-def test_tensorflow():
-	# Create a simple tensor
+def test_tensorflow(verbose: bool = False):
+	# Imported here so importing this module doesn't pay TensorFlow's startup cost
+	import tensorflow as tf
+	
 	print("TensorFlow version:", tf.__version__)
+	if not verbose:
+		return
+		
 	print("\nCreating and manipulating tensors:")
 	
 	# Create a tensor
@@ -14,4 +17,4 @@ def test_tensorflow():
 	print("\nResult of adding tensor to itself:", result)
 
 if __name__ == "__main__":
-	test_tensorflow()
\ No newline at end of file
+	test_tensorflow(verbose=True)
\ No newline at end of file